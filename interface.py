@@ -1,339 +1,674 @@
-import streamlit as st
-import pdfplumber
-import re
-import pandas as pd
-import math
-import random
-import time
-
-st.set_page_config(page_title="Frac Fluid Calculator", layout="wide")
-
-# === Custom CSS Styling & Animations for WHITE background ===
-st.markdown("""
-<style>
-/* 🔥 Fire Typewriter Effect (dark text on white) */
-.typewriter {
-  font-size: 20px;        /* medium size */
-  font-weight: bold;
-  color: #222222;         /* dark grey/black text for contrast */
-  display: inline-block;
-  overflow: hidden;
-  border-right: .15em solid #ff4500; /* blinking cursor */
-  white-space: nowrap;
-  letter-spacing: .1em;
-  width: 0;
-  animation: typing 4s steps(40, end) forwards,   /* type once & stay */
-             blink .75s step-end infinite,
-             fireglow 1s infinite alternate;
-  text-shadow:
-     0 0 5px #ff9900,
-     0 0 10px #ff6600,
-     0 0 20px #ff3300;
-}
-
-/* Type once then stop */
-@keyframes typing {
-  from { width: 0 }
-  to { width: 40ch }
-}
-
-/* Cursor blink */
-@keyframes blink {
-  50% { border-color: transparent }
-}
-
-/* Fire glow flicker */
-@keyframes fireglow {
-  from { text-shadow: 0 0 5px #ff9900, 0 0 10px #ff6600, 0 0 20px #ff3300; }
-  to   { text-shadow: 0 0 10px #ffcc00, 0 0 15px #ff5500, 0 0 25px #ff2200; }
-}
-</style>
-""", unsafe_allow_html=True)
-
-# === Title with typing effect ===
-st.markdown(
-    '<div style="text-align:center;"><span class="typewriter">🧪 Frac Fluid Calculation Tool v2.0</span></div>',
-    unsafe_allow_html=True
-)
-
-# === Subtitle (smaller + softer grey) ===
-st.markdown("""
-<p style='text-align:center; font-size:13px; color: #666666;'>
-Upload a FracFocus PDF or enter values manually to calculate fluid volumes.
-</p>
-""", unsafe_allow_html=True)
-
-
-# --- PDF Extraction ---
-def extract_values_from_pdf(file):
-    raw_lines = []
-    with pdfplumber.open(file) as pdf:
-        for page in pdf.pages:
-            text = page.extract_text()
-            if text:
-                raw_lines.extend(text.splitlines())
-
-    fixed_lines = []
-    skip_next = False
-    for i in range(len(raw_lines) - 1):
-        if skip_next:
-            skip_next = False
-            continue
-        current = raw_lines[i].strip()
-        next_line = raw_lines[i + 1].strip()
-        if current.lower() == "hydrochloric" and next_line.lower().startswith("acid"):
-            fixed_lines.append(f"{current} {next_line}")
-            skip_next = True
-        elif current.lower() == "crystalline" and next_line.lower().startswith("silica"):
-            fixed_lines.append(f"{current} {next_line}")
-            skip_next = True
-        else:
-            fixed_lines.append(current)
-    if not skip_next and raw_lines:
-        fixed_lines.append(raw_lines[-1].strip())
-
-    def find_number(pattern):
-        for line in fixed_lines:
-            if pattern in line:
-                nums = re.findall(r"\d+(?:\.\d+)?", line)
-                if nums:
-                    return float(nums[-1])
-        return None
-
-    def find_by_cas(cas):
-        for line in fixed_lines:
-            if cas in line:
-                nums = re.findall(r"\d+(?:\.\d+)?", line)
-                if nums:
-                    return float(nums[-1])
-        return None
-
-    # collect all possible proppants
-    proppant_percents = []
-    for line in fixed_lines:
-        if "14808-60-7" in line or "proppant" in line.lower():
-            nums = re.findall(r"\d+(?:\.\d+)?", line)
-            if nums:
-                proppant_percents.append(float(nums[-1]))
-
-    total_water = re.search(
-        r"Total Base Water Volume.*?:\s*(\d+)",
-        "\n".join(fixed_lines),
-        re.IGNORECASE
-    )
-
-    return {
-        "total_water_volume": int(total_water.group(1)) if total_water else None,
-        "water_percent": find_number("Water 7732-18-5"),
-        "hcl_percent": find_by_cas("7647-01-0"),
-        "proppant_percents": proppant_percents,
-        "gas_percent": 0.0,
-        "raw_lines": fixed_lines
-    }
-
-# --- Calculation Logic ---
-def calculate(total_water_volume, water_percent, hcl_percent, proppant_percents, gas_percent, gas_type):
-    # === Constants (Excel convention) ===
-    WATER_DENSITY_LBPGAL = 8.3454
-    HCL_DENSITY_LBPGAL = 8.95
-    GALLONS_PER_BBL = 42
-
-    # Step 1: Base water weight
-    total_water_weight = total_water_volume * WATER_DENSITY_LBPGAL
-
-    # Step 2: Proppant %
-    total_proppant_percent = sum(proppant_percents or [])
-
-    # Excel-style formula: (B10 * B18 / B3)
-    total_proppant_weight = 0.0
-    if total_proppant_percent and water_percent:
-        total_proppant_weight = (total_proppant_percent / water_percent) * total_water_weight
-
-    proppant_weight_tons = total_proppant_weight / 2000 if total_proppant_weight else 0.0
-
-    # Step 3: Mass % check
-    total_mass_percent = (water_percent or 0) + (hcl_percent or 0) + total_proppant_percent
-
-    # Step 4: Acid calculations
-    total_acid_weight = (hcl_percent / 100) * total_water_weight if hcl_percent else 0
-    total_acid_volume_gal = total_acid_weight / HCL_DENSITY_LBPGAL if total_acid_weight else 0
-    total_acid_volume_bbl = total_acid_volume_gal / GALLONS_PER_BBL if total_acid_volume_gal else 0
-
-    # Step 5: FF fluid volume
-    total_ff_fluid_volume_gal = total_water_volume - total_acid_volume_gal
-    total_ff_fluid_volume_bbl = total_ff_fluid_volume_gal / GALLONS_PER_BBL if total_ff_fluid_volume_gal else 0
-
-    # Step 6: PPG
-    ppg = total_proppant_weight / total_ff_fluid_volume_gal if total_ff_fluid_volume_gal else math.nan
-
-    # Step 7: Gas calculations
-    nitrogen_volume_scf = None
-    co2_weight_tons = None
-    gas_weight_lbs = None
-    remark = ""
-
-    if gas_type == "Nitrogen (N2)" and gas_percent > 0:
-        gas_weight_lbs = (gas_percent / 100) * total_water_weight
-        nitrogen_volume_scf = gas_weight_lbs * 13.803
-        remark = f"Nitrogen included at {gas_percent:.2f}% → {nitrogen_volume_scf:.0f} SCF estimated."
-    elif gas_type == "Carbon Dioxide (CO2)" and gas_percent > 0:
-        gas_weight_lbs = (gas_percent / 100) * total_water_weight
-        co2_weight_tons = gas_weight_lbs / 2000
-        remark = f"CO₂ included at {gas_percent:.2f}% → {co2_weight_tons:.2f} tons estimated."
-    else:
-        remark = "No gas contribution reported."
-
-    return {
-        "Total % Mass (Water+Acid+Proppant)": total_mass_percent,
-        "Total Water Weight (lbs)": total_water_weight,
-        "Total Acid(HCL) Weight (lbs)": total_acid_weight,
-        "Total Acid(HCL) Volume (gal)": total_acid_volume_gal,
-        "Total Acid(HCL) Volume (bbl)": total_acid_volume_bbl,
-        "Total FF Fluid Volume (gal)": total_ff_fluid_volume_gal,
-        "Total FF Fluid Volume (bbl)": total_ff_fluid_volume_bbl,
-        "Total Proppant Weight (lbs)": total_proppant_weight,
-        "Proppant Weight (tons)": proppant_weight_tons,
-        "Proppant to Fluid Ratio (PPG)": ppg,
-        "Total Gas Weight (lbs)": gas_weight_lbs,
-        "Total CO2 Weight (tons)": co2_weight_tons,
-        "Total Nitrogen Volume (SCF)": nitrogen_volume_scf,
-        "Remarks": remark
-    }
-
-
-# === Single Well Mode ===
-st.markdown("##  Single Well Mode")
-
-uploaded_file = st.file_uploader("📄 Upload a single FracFocus PDF", type=["pdf"], key="single")
-
-values = {
-    "total_water_volume": None,
-    "water_percent": None,
-    "hcl_percent": None,
-    "proppant_percents": [],
-    "gas_percent": 0.0,
-    "raw_lines": []
-}
-if uploaded_file:
-    st.success("✅ Targets acquired, numbers incoming….")
-    values.update(extract_values_from_pdf(uploaded_file))
-
-with st.sidebar:
-    st.header("⚙️ Inputs (Single Well)")
-    total_water_volume = st.number_input("Total Base Water Volume (gallons)", value=float(values["total_water_volume"] or 0), step=1.0, format="%.0f")
-    water_percent = st.number_input("Water Concentration (%)", value=values["water_percent"] or 0.0, step=0.0001)
-    hcl_percent = st.number_input("HCL Concentration (%)", value=values["hcl_percent"] or 0.0, step=0.0001)
-
-    st.subheader("Proppant Concentrations (%)")
-    proppant_percents = []
-    for i in range(1, 7):
-        val = values["proppant_percents"][i-1] if len(values["proppant_percents"]) >= i else 0.0
-        p = st.number_input(f"Proppant {i} (%)", value=val, step=0.0001)
-        proppant_percents.append(p)
-
-    gas_type = st.selectbox("Gas Type", ["None", "Nitrogen (N2)", "Carbon Dioxide (CO2)"])
-    gas_percent = st.number_input("Gas Concentration (%)", value=values.get("gas_percent", 0.0), step=0.0001)
-
-submitted = st.button(" Calculate (Single Well)")
-
-if submitted:
-    result = calculate(total_water_volume, water_percent, hcl_percent, proppant_percents, gas_percent, gas_type)
-
-    # KPI Cards
-    col1, col2, col3 = st.columns(3)
-    col1.metric("FF Fluid Volume (bbl)", f"{result['Total FF Fluid Volume (bbl)']:.2f}")
-    col2.metric("Proppant to Fluid Ratio (PPG)", f"{result['Proppant to Fluid Ratio (PPG)']:.2f}")
-    col3.metric("% Mass", f"{result['Total % Mass (Water+Acid+Proppant)']:.2f}%")
-
-    st.markdown("### 🧮 Detailed Results")
-    for key, val in result.items():
-        if isinstance(val, (int, float)) and not pd.isna(val):
-            st.write(f"**{key}:** {val:.2f}")
-        elif val is not None:
-            st.write(f"**{key}:** {val}")
-
-    st.info(f" {result['Remarks']}")
-
-    if result["Total % Mass (Water+Acid+Proppant)"] < 90 or result["Total % Mass (Water+Acid+Proppant)"] > 110:
-        st.warning("⚠️ Mass balance outside 90–110%. Please verify input values.")
-
-    # Copy-as-CSV
-    df = pd.DataFrame([result])
-    tsv_text = df.to_csv(index=False, sep="\t", float_format="%.2f")
-    st.text_area("📋 Copy Results (Excel-friendly)", tsv_text, height=200)
-    st.caption("Tip: Ctrl+A → Ctrl+C → Paste into Excel → splits into columns.")
-
-    # Excel Export
-    excel_file = "frac_fluid_results.xlsx"
-    df.to_excel(excel_file, index=False)
-    with open(excel_file, "rb") as f:
-        st.download_button("⬇️ Download Excel", f, file_name=excel_file, mime="application/vnd.ms-excel")
-
-    # Debug Panel
-    with st.expander("🔍 Debug Panel: Extracted PDF Lines"):
-        col1, col2 = st.columns(2)
-        col1.markdown("**Raw PDF Lines**")
-        col1.write(values["raw_lines"])
-        col2.markdown("**Parsed Values**")
-        col2.write(values)
-
-
-# === Multi-Well Batch Mode ===
-st.markdown("---")
-st.markdown("##  Multi-Well Batch Mode")
-
-fun_phrases = [
-    "🚀 Now we are talking!",
-    "🔥 Welcome to Beast Mode!",
-    "⚡ Buckle up, big jobs ahead…",
-    "💪 Time to crush multi-well madness!",
-    "🎯 Precision loading multiple PDFs…",
-    "🌋 Explosive data power unlocked!",
-    "🛢 Big data needs big energy!",
-    "⚔️ Entering Power User Mode…",
-    "🎮 God Mode Activated…",
-    "🔮 Multi-Well Magic starts now!"
-]
-
-if "show_batch" not in st.session_state:
-    st.session_state.show_batch = False
-
-if not st.session_state.show_batch:
-    if st.button("🐉 Multi-Wells, Batch Mode"):
-        phrase = random.choice(fun_phrases)
-        st.success(phrase)
-        time.sleep(1.5)
-        st.session_state.show_batch = True
-        st.rerun()
-else:
-    st.markdown("### 📂 Upload Multiple PDFs")
-    uploaded_files = st.file_uploader("Upload multiple FracFocus PDFs", type=["pdf"], accept_multiple_files=True, key="multi")
-
-    if uploaded_files:
-        all_results = []
-        for file in uploaded_files:
-            try:
-                vals = extract_values_from_pdf(file)
-                calc = calculate(
-                    vals["total_water_volume"] or 0,
-                    vals["water_percent"] or 0.0,
-                    vals["hcl_percent"] or 0.0,
-                    vals.get("proppant_percents", []),
-                    vals["gas_percent"] or 0.0,
-                    "None"
-                )
-                calc["File"] = file.name
-                all_results.append(calc)
-            except Exception as e:
-                st.error(f"❌ Failed to process {file.name}: {e}")
-
-        if all_results:
-            batch_df = pd.DataFrame(all_results)
-            st.markdown("### 📊 Batch Results Summary")
-            st.dataframe(batch_df)
-
-            excel_file = "multi_well_results.xlsx"
-            batch_df.to_excel(excel_file, index=False)
-            with open(excel_file, "rb") as f:
-                st.download_button("⬇️ Download All Results (Excel)", f, file_name=excel_file, mime="application/vnd.ms-excel")
-
+import streamlit as st
+import hashlib
+import io
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, fields as dataclass_fields
+from pathlib import Path
+import math
+import random
+import time
+
+# pandas and the PDF parser are imported lazily inside the branches that
+# need them — they dominate cold-start time and sessions that never
+# upload or submit shouldn't pay for them
+
+# Precompiled patterns (module scope so Streamlit reruns reuse them).
+# _LAST_NUM_RE grabs the last number on a line in one search, with no
+# intermediate findall list to allocate and index.
+_LAST_NUM_RE = re.compile(r"(\d+(?:\.\d+)?)(?!.*\d)")
+_last_num_search = _LAST_NUM_RE.search  # bound once; called per matched line
+_TOTAL_WATER_RE = re.compile(r"Total Base Water Volume.*?:\s*(\d+)", re.IGNORECASE)
+# Cheap page gate: anything CAS-shaped (NNN-NN-N), a total-water mention,
+# or a keyword proppant row (collected without any CAS token)
+_CAS_HINT_RE = re.compile(r"\d{2,7}-\d{2}-\d|Total Base Water|proppant", re.IGNORECASE)
+# Rejoins the hydrochloric/acid and crystalline/silica line splits in one
+# C-level scan over a whole batch of lines
+_SPLIT_FIX_RE = re.compile(
+    r"^[ \t]*(Hydrochloric)[ \t\r]*\n[ \t]*(acid[^\n]*)"
+    r"|^[ \t]*(Crystalline)[ \t\r]*\n[ \t]*(silica[^\n]*)",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+# Substring -> result field, scanned line by line
+_TARGETS = (
+    ("Water 7732-18-5", "water_percent"),
+    ("7647-01-0", "hcl_percent"),
+)
+_SCALAR_FIELDS = ("total_water_volume", "water_percent", "hcl_percent")
+
+# Pages parsed per batch before checking whether extraction is complete
+_PAGE_BATCH = 8
+
+st.set_page_config(page_title="Frac Fluid Calculator", layout="wide")
+
+# === Custom CSS Styling & Animations for WHITE background ===
+@st.cache_data
+def _page_css() -> str:
+    """Page CSS, read from style.css once per server instead of shipping
+    the block through every rerun of the script body."""
+    with open(Path(__file__).with_name("style.css"), encoding="utf-8") as f:
+        return f"<style>{f.read()}</style>"
+
+
+st.markdown(_page_css(), unsafe_allow_html=True)
+
+# === Title with typing effect ===
+st.markdown(
+    '<div style="text-align:center;"><span class="typewriter">🧪 Frac Fluid Calculation Tool v2.0</span></div>',
+    unsafe_allow_html=True
+)
+
+# === Subtitle (smaller + softer grey) ===
+st.markdown("""
+<p style='text-align:center; font-size:13px; color: #666666;'>
+Upload a FracFocus PDF or enter values manually to calculate fluid volumes.
+</p>
+""", unsafe_allow_html=True)
+
+
+# --- PDF Extraction ---
+def _extract_pages(data, indices):
+    """Pull text for the given page indices in order, fanning out across
+    threads when there is more than one page. MuPDF documents are not
+    thread-safe, so each worker opens its own document from the shared
+    PDF bytes (a cheap in-memory open) instead of touching a common one."""
+    import pymupdf
+
+    def one(index):
+        with pymupdf.open(stream=data, filetype="pdf") as doc:
+            return doc[index].get_text("text") or ""
+
+    indices = list(indices)
+    if len(indices) <= 1:
+        return [one(i) for i in indices]
+    with ThreadPoolExecutor(max_workers=min(8, len(indices))) as ex:
+        return list(ex.map(one, indices))
+
+
+def _iter_page_texts(file):
+    """Yield page text in document order, parsing one batch of pages at a
+    time so the caller can stop before later pages are ever touched."""
+    try:
+        import pymupdf  # MuPDF's C engine is far faster than pdfminer-based stacks
+    except ImportError:
+        pymupdf = None
+    if pymupdf is not None:
+        data = file.read()
+        with pymupdf.open(stream=data, filetype="pdf") as doc:
+            page_count = doc.page_count
+        for start in range(0, page_count, _PAGE_BATCH):
+            indices = range(start, min(start + _PAGE_BATCH, page_count))
+            yield from _extract_pages(data, indices)
+    else:
+        # pdfium skips layout analysis entirely: textpages give raw text
+        # without materializing per-character objects. pdfium is not
+        # thread-safe, so this path stays sequential.
+        import pypdfium2 as pdfium
+        pdf = pdfium.PdfDocument(file.read())
+        try:
+            for page in pdf:
+                textpage = page.get_textpage()
+                yield textpage.get_text_range() or ""
+                textpage.close()
+                page.close()
+        finally:
+            pdf.close()
+
+
+def _fixed_lines_of(text):
+    """Yield stripped lines of text with the hydrochloric/acid and
+    crystalline/silica splits merged, via one _SPLIT_FIX_RE.sub over the
+    raw text — no intermediate line list to build and re-join."""
+    fixed = _SPLIT_FIX_RE.sub(lambda m: " ".join(g for g in m.groups() if g), text)
+    for line in fixed.splitlines():
+        yield line.strip()
+
+
+def _scan_line(line, results, proppant_percents):
+    """Single-pass dispatch: check every target field against one line."""
+    if not line:
+        return
+    for key, dest in _TARGETS:
+        if dest in results or key not in line:
+            continue
+        m = _last_num_search(line)
+        if m:
+            results[dest] = float(m.group(1))
+    line_lower = line.lower()
+    # collect all possible proppants
+    if "14808-60-7" in line or "proppant" in line_lower:
+        m = _last_num_search(line)
+        if m:
+            proppant_percents.append(float(m.group(1)))
+    # total water volume lives on a single line; a plain substring test
+    # keeps the backtracking regex off every other line
+    if "total_water_volume" not in results and "total base water volume" in line_lower:
+        m = _TOTAL_WATER_RE.search(line)
+        if m:
+            results["total_water_volume"] = int(m.group(1))
+
+
+def extract_values_from_pdf(file):
+    results = {}
+    proppant_percents = []
+    fixed_lines = []
+    carry = ""  # trailing line held back for cross-page merges
+    for text in _iter_page_texts(file):
+        # graphics-heavy supplement pages yield text with nothing
+        # CAS-shaped in it; skip their line processing entirely
+        if not text or not _CAS_HINT_RE.search(text):
+            continue
+        if carry:
+            text = f"{carry}\n{text}"
+        # hold the last line back: it may merge with the next page's
+        # first. Page text ends with a newline, which must go before the
+        # rfind or the held-back "line" is always empty.
+        if text.endswith("\n"):
+            text = text[:-1]
+        cut = text.rfind("\n")
+        if cut < 0:
+            carry = text
+            continue
+        text, carry = text[:cut], text[cut + 1:]
+        seen_proppants = len(proppant_percents)
+        for line in _fixed_lines_of(text):
+            _scan_line(line, results, proppant_percents)
+            fixed_lines.append(line)
+        # chemical data sits on the first pages of FracFocus reports, but
+        # the ingredient table can spill proppant rows onto later pages —
+        # stop only once the scalars are filled (results only ever holds
+        # those, so a length check suffices) and a hint-passing page has
+        # contributed no further proppant rows
+        if (proppant_percents and len(proppant_percents) == seen_proppants
+                and len(results) == len(_SCALAR_FIELDS)):
+            break
+    # the held-back line belongs to a page that was already parsed, so it
+    # must be scanned even when the early break fired
+    if carry:
+        for line in _fixed_lines_of(carry):
+            _scan_line(line, results, proppant_percents)
+            fixed_lines.append(line)
+
+    return {
+        "total_water_volume": results.get("total_water_volume"),
+        "water_percent": results.get("water_percent"),
+        "hcl_percent": results.get("hcl_percent"),
+        "proppant_percents": proppant_percents,
+        "gas_percent": 0.0,
+        "raw_lines": fixed_lines
+    }
+
+
+def _pdf_key(data: bytes) -> bytes:
+    """16-byte content digest; blake2b is faster than sha256 on CPUs
+    without SHA extensions."""
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+@st.cache_data(show_spinner="Extracting PDF...", max_entries=64)
+def _extract_cached(key: bytes, _data: bytes) -> dict:
+    """Memoized extraction. The cache keys on the 16-byte digest only —
+    the underscore keeps Streamlit from rehashing the whole PDF on every
+    rerun's lookup."""
+    return extract_values_from_pdf(io.BytesIO(_data))
+
+
+@st.cache_data(show_spinner=False)
+def _excel_bytes(rows: list) -> bytes:
+    """Render result rows to xlsx bytes in memory — no temp file on disk,
+    and reruns with the same results reuse the cached workbook. The
+    DataFrame only exists inside this cached helper."""
+    import pandas as pd
+    buf = io.BytesIO()
+    with pd.ExcelWriter(buf) as writer:
+        pd.DataFrame(rows).to_excel(writer, index=False)
+    return buf.getvalue()
+
+
+def _tsv_cell(val):
+    if val is None:
+        return ""
+    if isinstance(val, float):
+        return f"{val:.2f}"
+    return str(val)
+
+
+# --- Calculation Logic ---
+
+# === Constants (Excel convention) ===
+WATER_DENSITY_LBPGAL = 8.3454
+HCL_DENSITY_LBPGAL = 8.95
+GALLONS_PER_BBL = 42
+
+# Display labels, in the same order CalcResult declares its fields
+_RESULT_LABELS = (
+    "Total % Mass (Water+Acid+Proppant)",
+    "Total Water Weight (lbs)",
+    "Total Acid(HCL) Weight (lbs)",
+    "Total Acid(HCL) Volume (gal)",
+    "Total Acid(HCL) Volume (bbl)",
+    "Total FF Fluid Volume (gal)",
+    "Total FF Fluid Volume (bbl)",
+    "Total Proppant Weight (lbs)",
+    "Proppant Weight (tons)",
+    "Proppant to Fluid Ratio (PPG)",
+    "Total Gas Weight (lbs)",
+    "Total CO2 Weight (tons)",
+    "Total Nitrogen Volume (SCF)",
+    "Remarks",
+)
+
+
+@dataclass(slots=True, frozen=True)
+class CalcResult:
+    """Output of calculate(); field order mirrors _calc_core's value tuple
+    (plus remarks), so labels come from the parallel _RESULT_LABELS tuple
+    and no per-call dict has to be built."""
+    total_mass_percent: float
+    total_water_weight: float
+    total_acid_weight: float
+    total_acid_volume_gal: float
+    total_acid_volume_bbl: float
+    total_ff_fluid_volume_gal: float
+    total_ff_fluid_volume_bbl: float
+    total_proppant_weight: float
+    proppant_weight_tons: float
+    ppg: float
+    gas_weight_lbs: float | None
+    co2_weight_tons: float | None
+    nitrogen_volume_scf: float | None
+    remarks: str
+
+    def items(self):
+        """Yield (display label, value) pairs in declaration order."""
+        for label, f in zip(_RESULT_LABELS, dataclass_fields(self)):
+            yield label, getattr(self, f.name)
+
+    def as_row(self):
+        """Label→value dict for the Excel export and batch table."""
+        return dict(self.items())
+
+
+def _calc_core(total_water_volume, water_percent, hcl_percent,
+               total_proppant_percent, gas_percent, gas_type_int):
+    """Straight-line arithmetic kernel; gas_type_int is 0=None, 1=N2,
+    2=CO2, and missing gas terms come back as NaN."""
+    # Step 1: Base water weight
+    total_water_weight = total_water_volume * WATER_DENSITY_LBPGAL
+
+    # Step 2: Proppant weight — Excel-style formula: (B10 * B18 / B3)
+    total_proppant_weight = 0.0
+    if total_proppant_percent and water_percent:
+        total_proppant_weight = (total_proppant_percent / water_percent) * total_water_weight
+    proppant_weight_tons = total_proppant_weight / 2000
+
+    # Step 3: Mass % check
+    total_mass_percent = water_percent + hcl_percent + total_proppant_percent
+
+    # Step 4: Acid calculations (multiply by 0.01 rather than divide by
+    # 100: strength-reduced, and zero percentages flow through as zeros
+    # with no branch)
+    total_acid_weight = hcl_percent * 0.01 * total_water_weight
+    total_acid_volume_gal = total_acid_weight / HCL_DENSITY_LBPGAL
+    total_acid_volume_bbl = total_acid_volume_gal / GALLONS_PER_BBL
+
+    # Step 5: FF fluid volume
+    total_ff_fluid_volume_gal = total_water_volume - total_acid_volume_gal
+    total_ff_fluid_volume_bbl = total_ff_fluid_volume_gal / GALLONS_PER_BBL
+
+    # Step 6: PPG
+    ppg = total_proppant_weight / total_ff_fluid_volume_gal if total_ff_fluid_volume_gal else math.nan
+
+    # Step 7: Gas calculations
+    gas_weight_lbs = math.nan
+    co2_weight_tons = math.nan
+    nitrogen_volume_scf = math.nan
+    if gas_type_int and gas_percent > 0:
+        gas_weight_lbs = gas_percent * 0.01 * total_water_weight
+        if gas_type_int == 1:
+            nitrogen_volume_scf = gas_weight_lbs * 13.803
+        else:
+            co2_weight_tons = gas_weight_lbs / 2000
+
+    return (
+        total_mass_percent,
+        total_water_weight,
+        total_acid_weight,
+        total_acid_volume_gal,
+        total_acid_volume_bbl,
+        total_ff_fluid_volume_gal,
+        total_ff_fluid_volume_bbl,
+        total_proppant_weight,
+        proppant_weight_tons,
+        ppg,
+        gas_weight_lbs,
+        co2_weight_tons,
+        nitrogen_volume_scf,
+    )
+
+
+# numba is a heavy import and LLVM-compiles the kernels, so JIT setup is
+# deferred to the first calculation — cold page loads shouldn't pay for
+# it. The compiled dispatchers live in st.cache_resource because plain
+# module globals are wiped by every script rerun, which would mean a
+# fresh recompile per click; on-disk caching (cache=True) is no
+# alternative, since Streamlit scripts are not importable modules and
+# numba's cache cannot rebuild their environment.
+@st.cache_resource(show_spinner=False)
+def _jit_kernels():
+    """Compile and warm the numba kernels once per server process.
+    Returns (scalar, vector) dispatchers, or (None, None) when numba is
+    unavailable so the pure-Python/NumPy paths stay in place."""
+    try:
+        from numba import njit, prange
+    except ImportError:
+        return None, None
+    import numpy as np
+
+    _scalar_core = njit(fastmath=True)(_calc_core)
+
+    @njit(fastmath=True, parallel=True)
+    def _vec_core(twv, wat, hcl, prop, out):
+        """Fused batch kernel: one parallel loop fills the (10, n) output
+        with the numeric columns, no ufunc temporaries in between."""
+        for i in prange(twv.shape[0]):
+            w = twv[i] * WATER_DENSITY_LBPGAL
+            pw = (prop[i] / wat[i]) * w if wat[i] != 0.0 else 0.0
+            acid_w = hcl[i] * 0.01 * w
+            acid_gal = acid_w / HCL_DENSITY_LBPGAL
+            ff_gal = twv[i] - acid_gal
+            out[0, i] = wat[i] + hcl[i] + prop[i]
+            out[1, i] = w
+            out[2, i] = acid_w
+            out[3, i] = acid_gal
+            out[4, i] = acid_gal / GALLONS_PER_BBL
+            out[5, i] = ff_gal
+            out[6, i] = ff_gal / GALLONS_PER_BBL
+            out[7, i] = pw
+            out[8, i] = pw / 2000.0
+            out[9, i] = pw / ff_gal if ff_gal != 0.0 else math.nan
+
+    # warm both so the first real click never pays compile time
+    _scalar_core(0.0, 0.0, 0.0, 0.0, 0.0, 0)
+    zeros = np.zeros(1)
+    _vec_core(zeros, zeros, zeros, zeros, np.empty((10, 1)))
+    return _scalar_core, _vec_core
+
+
+def calculate_vec(total_water_volume, water_percent, hcl_percent, total_proppant_percent):
+    """Vectorized batch counterpart of _calc_core for gas-free wells: the
+    same formulas over length-N float arrays, returned as a label->column
+    mapping ready for one-shot DataFrame construction. With numba the
+    whole batch runs through the fused _calc_vec_core loop; otherwise the
+    plain ufunc path below is used."""
+    import numpy as np
+
+    _, vec_core = _jit_kernels()
+    n = len(total_water_volume)
+    if vec_core is not None:
+        out = np.empty((10, n))
+        vec_core(total_water_volume, water_percent, hcl_percent,
+                 total_proppant_percent, out)
+        (total_mass_percent, total_water_weight, total_acid_weight,
+         total_acid_volume_gal, total_acid_volume_bbl,
+         total_ff_fluid_volume_gal, total_ff_fluid_volume_bbl,
+         total_proppant_weight, proppant_weight_tons, ppg) = out
+    else:
+        total_water_weight = total_water_volume * WATER_DENSITY_LBPGAL
+        ratio = np.divide(total_proppant_percent, water_percent,
+                          out=np.zeros_like(total_water_weight), where=water_percent != 0)
+        total_proppant_weight = ratio * total_water_weight
+        proppant_weight_tons = total_proppant_weight / 2000
+        total_mass_percent = water_percent + hcl_percent + total_proppant_percent
+        total_acid_weight = hcl_percent * 0.01 * total_water_weight
+        total_acid_volume_gal = total_acid_weight / HCL_DENSITY_LBPGAL
+        total_acid_volume_bbl = total_acid_volume_gal / GALLONS_PER_BBL
+        total_ff_fluid_volume_gal = total_water_volume - total_acid_volume_gal
+        total_ff_fluid_volume_bbl = total_ff_fluid_volume_gal / GALLONS_PER_BBL
+        ppg = np.divide(total_proppant_weight, total_ff_fluid_volume_gal,
+                        out=np.full_like(total_water_weight, math.nan),
+                        where=total_ff_fluid_volume_gal != 0)
+    nan_col = np.full(n, math.nan)
+    return dict(zip(_RESULT_LABELS, (
+        total_mass_percent,
+        total_water_weight,
+        total_acid_weight,
+        total_acid_volume_gal,
+        total_acid_volume_bbl,
+        total_ff_fluid_volume_gal,
+        total_ff_fluid_volume_bbl,
+        total_proppant_weight,
+        proppant_weight_tons,
+        ppg,
+        nan_col,
+        nan_col,
+        nan_col,
+        ["No gas contribution reported."] * n,
+    )))
+
+
+@st.cache_data(show_spinner=False)
+def calculate(total_water_volume, water_percent, hcl_percent, total_proppant_percent, gas_percent, gas_type):
+    scalar_core, _ = _jit_kernels()
+    gas_type_int = {"Nitrogen (N2)": 1, "Carbon Dioxide (CO2)": 2}.get(gas_type, 0)
+    values = (scalar_core or _calc_core)(
+        float(total_water_volume or 0),
+        float(water_percent or 0),
+        float(hcl_percent or 0),
+        float(total_proppant_percent or 0),
+        float(gas_percent or 0),
+        gas_type_int,
+    )
+    # Gas terms are NaN when not applicable; the UI expects None there
+    gas_weight_lbs, co2_weight_tons, nitrogen_volume_scf = (
+        None if math.isnan(v) else v for v in values[10:13]
+    )
+
+    if gas_type_int == 1 and gas_percent > 0:
+        remarks = f"Nitrogen included at {gas_percent:.2f}% → {nitrogen_volume_scf:.0f} SCF estimated."
+    elif gas_type_int == 2 and gas_percent > 0:
+        remarks = f"CO₂ included at {gas_percent:.2f}% → {co2_weight_tons:.2f} tons estimated."
+    else:
+        remarks = "No gas contribution reported."
+
+    return CalcResult(*values[:10], gas_weight_lbs, co2_weight_tons, nitrogen_volume_scf, remarks)
+
+
+# === Single Well Mode ===
+st.markdown("##  Single Well Mode")
+
+uploaded_file = st.file_uploader("📄 Upload a single FracFocus PDF", type=["pdf"], key="single")
+
+values = {
+    "total_water_volume": None,
+    "water_percent": None,
+    "hcl_percent": None,
+    "proppant_percents": [],
+    "gas_percent": 0.0,
+    "raw_lines": []
+}
+if uploaded_file:
+    # only touch the PDF when the upload actually changes; ordinary
+    # widget-driven reruns read the parked values from session state
+    if st.session_state.get("_pdf_id") != uploaded_file.file_id:
+        data = uploaded_file.getvalue()
+        st.session_state["pdf_values"] = _extract_cached(_pdf_key(data), data)
+        st.session_state["_pdf_id"] = uploaded_file.file_id
+        st.success("✅ Targets acquired, numbers incoming….")
+    values.update(st.session_state["pdf_values"])
+
+with st.sidebar:
+    st.header("⚙️ Inputs (Single Well)")
+    total_water_volume = st.number_input("Total Base Water Volume (gallons)", value=float(values["total_water_volume"] or 0), step=1.0, format="%.0f")
+    water_percent = st.number_input("Water Concentration (%)", value=values["water_percent"] or 0.0, step=0.0001)
+    hcl_percent = st.number_input("HCL Concentration (%)", value=values["hcl_percent"] or 0.0, step=0.0001)
+
+    st.subheader("Proppant Concentrations (%)")
+    # pad the parsed defaults to the six widget slots once, then build the
+    # value list in a single comprehension
+    defaults = (tuple(values["proppant_percents"]) + (0.0,) * 6)[:6]
+    proppant_percents = [
+        st.number_input(f"Proppant {i + 1} (%)", value=val, step=0.0001)
+        for i, val in enumerate(defaults)
+    ]
+
+    gas_type = st.selectbox("Gas Type", ["None", "Nitrogen (N2)", "Carbon Dioxide (CO2)"])
+    gas_percent = st.number_input("Gas Concentration (%)", value=values.get("gas_percent", 0.0), step=0.0001)
+
+submitted = st.button(" Calculate (Single Well)")
+
+if submitted:
+    # pre-sum at the widget layer so calculate() takes a plain scalar
+    total_proppant_percent = sum(proppant_percents)
+    result = calculate(total_water_volume, water_percent, hcl_percent, total_proppant_percent, gas_percent, gas_type)
+
+    # KPI Cards
+    col1, col2, col3 = st.columns(3)
+    col1.metric("FF Fluid Volume (bbl)", f"{result.total_ff_fluid_volume_bbl:.2f}")
+    col2.metric("Proppant to Fluid Ratio (PPG)", f"{result.ppg:.2f}")
+    col3.metric("% Mass", f"{result.total_mass_percent:.2f}%")
+
+    st.markdown("### 🧮 Detailed Results")
+    for key, val in result.items():
+        if isinstance(val, (int, float)):
+            if val != val:  # NaN — no pandas dispatch on the render path
+                continue
+            st.write(f"**{key}:** {val:.2f}")
+        elif val is not None:
+            st.write(f"**{key}:** {val}")
+
+    st.info(f" {result.remarks}")
+
+    if result.total_mass_percent < 90 or result.total_mass_percent > 110:
+        st.warning("⚠️ Mass balance outside 90–110%. Please verify input values.")
+
+    # Copy-as-CSV — plain string formatting, no DataFrame on the render path
+    tsv_text = "\t".join(_RESULT_LABELS) + "\n" \
+        + "\t".join(_tsv_cell(v) for _, v in result.items()) + "\n"
+    st.text_area("📋 Copy Results (Excel-friendly)", tsv_text, height=200)
+    st.caption("Tip: Ctrl+A → Ctrl+C → Paste into Excel → splits into columns.")
+
+    # Excel Export
+    st.download_button(
+        "⬇️ Download Excel",
+        _excel_bytes([result.as_row()]),
+        file_name="frac_fluid_results.xlsx",
+        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    )
+
+    # Debug Panel
+    with st.expander("🔍 Debug Panel: Extracted PDF Lines"):
+        col1, col2 = st.columns(2)
+        col1.markdown("**Raw PDF Lines**")
+        col1.write(values["raw_lines"])
+        col2.markdown("**Parsed Values**")
+        col2.write(values)
+
+
+# === Multi-Well Batch Mode ===
+st.markdown("---")
+st.markdown("##  Multi-Well Batch Mode")
+
+fun_phrases = [
+    "🚀 Now we are talking!",
+    "🔥 Welcome to Beast Mode!",
+    "⚡ Buckle up, big jobs ahead…",
+    "💪 Time to crush multi-well madness!",
+    "🎯 Precision loading multiple PDFs…",
+    "🌋 Explosive data power unlocked!",
+    "🛢 Big data needs big energy!",
+    "⚔️ Entering Power User Mode…",
+    "🎮 God Mode Activated…",
+    "🔮 Multi-Well Magic starts now!"
+]
+
+if "show_batch" not in st.session_state:
+    st.session_state.show_batch = False
+
+if not st.session_state.show_batch:
+    if st.button("🐉 Multi-Wells, Batch Mode"):
+        phrase = random.choice(fun_phrases)
+        st.success(phrase)
+        time.sleep(1.5)
+        st.session_state.show_batch = True
+        st.rerun()
+else:
+    st.markdown("### 📂 Upload Multiple PDFs")
+    uploaded_files = st.file_uploader("Upload multiple FracFocus PDFs", type=["pdf"], accept_multiple_files=True, key="multi")
+
+    # parsing 50 PDFs just because they were dropped in the uploader is
+    # wasted work — wait for an explicit run, then park the results in
+    # session state so they survive subsequent reruns
+    if uploaded_files and st.button("🚀 Run Batch"):
+        # extraction dominates batch time and releases the GIL in the C
+        # parser, so fan it out across files; calculate() is trivial and
+        # runs serially afterwards. Worker threads must not touch st.*,
+        # so failures are collected and rendered after the pool drains.
+        errors = []
+
+        def _extract_one(item):
+            digest, data = item
+            try:
+                return digest, extract_values_from_pdf(io.BytesIO(data))
+            except Exception as e:
+                errors.append((digest, e))
+                return digest, None
+
+        # duplicate uploads (same bytes) are parsed once — the blake2b
+        # digest is far cheaper than any PDF parser
+        digests = []
+        unique = {}
+        for f in uploaded_files:
+            data = f.getvalue()
+            digest = _pdf_key(data)
+            digests.append(digest)
+            unique.setdefault(digest, data)
+
+        with ThreadPoolExecutor(max_workers=min(8, len(unique))) as ex:
+            parsed_by_digest = dict(ex.map(_extract_one, unique.items()))
+
+        failed = dict(errors)
+        for f, digest in zip(uploaded_files, digests):
+            if digest in failed:
+                st.error(f"❌ Failed to process {f.name}: {failed[digest]}")
+
+        parsed = [(f.name, parsed_by_digest[digest])
+                  for f, digest in zip(uploaded_files, digests)
+                  if parsed_by_digest.get(digest) is not None]
+        if parsed:
+            import numpy as np
+
+            # one vectorized compute pass over the whole batch instead of
+            # a scalar calculate() call and dict per file
+            twv = np.array([vals["total_water_volume"] or 0 for _, vals in parsed], dtype=np.float64)
+            wat = np.array([vals["water_percent"] or 0.0 for _, vals in parsed], dtype=np.float64)
+            hcl = np.array([vals["hcl_percent"] or 0.0 for _, vals in parsed], dtype=np.float64)
+            prop = np.array([sum(vals.get("proppant_percents", []) or []) for _, vals in parsed], dtype=np.float64)
+            cols = calculate_vec(twv, wat, hcl, prop)
+            cols["File"] = [name for name, _ in parsed]
+            # polars builds the frame from the column dict without the
+            # row-oriented from_records pass and hands Arrow data to
+            # st.dataframe directly; pandas remains the fallback
+            try:
+                import polars as pl
+                batch_df = pl.DataFrame(cols)
+            except ImportError:
+                import pandas as pd
+                batch_df = pd.DataFrame(cols)
+            st.session_state["batch_df"] = batch_df
+
+    batch_df = st.session_state.get("batch_df")
+    if batch_df is not None:
+        st.markdown("### 📊 Batch Results Summary")
+        st.dataframe(batch_df)
+
+        rows = (batch_df.to_dicts() if hasattr(batch_df, "to_dicts")
+                else batch_df.to_dict("records"))
+        st.download_button(
+            "⬇️ Download All Results (Excel)",
+            _excel_bytes(rows),
+            file_name="multi_well_results.xlsx",
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        )
+